@@ -1,5 +1,5 @@
-import requests
-import time
+import asyncio
+import aiohttp
 
 API_URL = "http://localhost:8000"
 
@@ -16,22 +16,33 @@ TEST_ISSUES = [
     "Assembly tolerance out of spec",
 ]
 
-print("🚀 Generating test data...")
-print("=" * 50)
 
-for i, issue in enumerate(TEST_ISSUES, 1):
-    try:
-        response = requests.post(
-            f"{API_URL}/issues",
-            json={"text": issue},
-            timeout=10
+async def post_issue(session, issue):
+    async with session.post(f"{API_URL}/issues", json={"text": issue}) as response:
+        response.raise_for_status()
+        return await response.json()
+
+
+async def main():
+    print("🚀 Generating test data...")
+    print("=" * 50)
+
+    timeout = aiohttp.ClientTimeout(total=10)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        results = await asyncio.gather(
+            *(post_issue(session, issue) for issue in TEST_ISSUES),
+            return_exceptions=True
         )
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ [{i:2d}/10] {data['category']:15s} → {issue[:40]}")
-        time.sleep(0.3)
-    except Exception as e:
-        print(f"❌ [{i:2d}/10] Failed: {issue[:40]}")
-
-print("=" * 50)
-print("✅ Done! View at http://localhost:3000")
\ No newline at end of file
+
+    for i, (issue, result) in enumerate(zip(TEST_ISSUES, results), 1):
+        if isinstance(result, Exception):
+            print(f"❌ [{i:2d}/10] Failed: {issue[:40]}")
+        else:
+            print(f"✅ [{i:2d}/10] {result['category']:15s} → {issue[:40]}")
+
+    print("=" * 50)
+    print("✅ Done! View at http://localhost:3000")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,14 +1,47 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import sqlite3
 import json
+import orjson
 import re
-import hashlib
+import uuid
+from array import array
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from operator import itemgetter
+import ahocorasick
+import queue
+import threading
+import logging
+import os
+import sys
+import time
 
-app = FastAPI(title="IssueFlow API")
+logger = logging.getLogger(__name__)
+
+class OrjsonResponse(JSONResponse):
+    # Same as fastapi.responses.ORJSONResponse, which newer FastAPI deprecates
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Done at startup rather than import, so only the processes that serve
+    # requests open the database (uvicorn's supervisor imports us too)
+    init_db()
+    _load_vocab()
+    threading.Thread(target=_writer_loop, name="issue-writer", daemon=True).start()
+    yield
+    # Don't drop issues that were accepted but not yet written
+    _write_q.join()
+    DB.close()
+    WRITER_DB.close()
+
+app = FastAPI(title="IssueFlow API", default_response_class=OrjsonResponse, lifespan=lifespan)
 
 
 app.add_middleware(
@@ -19,28 +52,208 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Two long-lived connections per process, both in autocommit mode
+# (isolation_level=None), opened by init_db at startup. DB serves the read
+# endpoints; WRITER_DB is only used by insert_issues under DB_WRITE_LOCK,
+# inside an explicit transaction. Keeping them apart means readers only ever
+# see committed rows, and under WAL they don't block on the writer.
+DB: Optional[sqlite3.Connection] = None
+WRITER_DB: Optional[sqlite3.Connection] = None
+DB_WRITE_LOCK = threading.Lock()
+
 def init_db():
-    conn = sqlite3.connect('issueflow.db')
-    cursor = conn.cursor()
-    cursor.execute('''
+    global DB, WRITER_DB
+    DB = sqlite3.connect('issueflow.db', check_same_thread=False, isolation_level=None)
+    WRITER_DB = sqlite3.connect('issueflow.db', check_same_thread=False, isolation_level=None)
+    DB.execute("PRAGMA journal_mode=WAL")
+    for conn in (DB, WRITER_DB):
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+    DB.execute('''
         CREATE TABLE IF NOT EXISTS issues (
             id TEXT PRIMARY KEY,
             raw_text TEXT NOT NULL,
             category TEXT NOT NULL,
             severity TEXT NOT NULL,
-            entities TEXT NOT NULL,
+            entities BLOB NOT NULL,
             timestamp TEXT NOT NULL
         )
     ''')
-    conn.commit()
-    conn.close()
+    DB.execute('''
+        CREATE TABLE IF NOT EXISTS vocab (
+            id INTEGER PRIMARY KEY,
+            term TEXT UNIQUE NOT NULL
+        )
+    ''')
+    DB.execute("CREATE INDEX IF NOT EXISTS idx_ts ON issues(timestamp DESC)")
+    DB.execute("CREATE INDEX IF NOT EXISTS idx_cat_ts ON issues(category, timestamp DESC)")
+    DB.execute("CREATE INDEX IF NOT EXISTS idx_sev_ts ON issues(severity, timestamp DESC)")
+
+# Bumped after every committed insert so cached reads can tell they're stale
+_write_generation = 0
+
+def insert_issues(rows):
+    """Insert issue rows with one executemany in a single transaction.
+
+    Rows are (id, raw_text, category, severity, entities, timestamp) with
+    entities as a list of terms; they are encoded here.
+    """
+    global _write_generation
+    with DB_WRITE_LOCK:
+        # IMMEDIATE takes the write lock up front, so a writer in another
+        # worker process makes us wait on the busy timeout instead of failing
+        WRITER_DB.execute("BEGIN IMMEDIATE")
+        try:
+            new_terms = {}
+            WRITER_DB.executemany('''
+                INSERT INTO issues (id, raw_text, category, severity, entities, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [
+                (issue_id, text, category, severity, encode_entities(entities, new_terms), timestamp)
+                for issue_id, text, category, severity, entities, timestamp in rows
+            ])
+            WRITER_DB.execute("COMMIT")
+        except sqlite3.Error:
+            WRITER_DB.execute("ROLLBACK")
+            raise
+        _cache_vocab((term_id, term) for term, term_id in new_terms.items())
+        _write_generation += 1
+
+# Inserts are handed off to a single background writer so the request path
+# never waits on a commit. The writer drains the queue in batches and writes
+# each batch with one executemany inside a single transaction.
+WRITE_BATCH_SIZE = 1000
+WRITE_BATCH_WINDOW = 0.05  # seconds to wait for a batch to fill up
+
+_write_q = queue.Queue()
+
+def _writer_loop():
+    while True:
+        items = [_write_q.get()]
+        deadline = time.monotonic() + WRITE_BATCH_WINDOW
+        while len(items) < WRITE_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(_write_q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            insert_issues(items)
+        except sqlite3.Error:
+            # These issues were already accepted, so don't let one bad row
+            # take the rest of the batch down with it
+            logger.exception("Failed to write batch of %d issues, retrying one at a time", len(items))
+            for item in items:
+                try:
+                    insert_issues([item])
+                except sqlite3.Error:
+                    logger.exception("Failed to write issue %s", item[0])
+        finally:
+            for _ in items:
+                _write_q.task_done()
+
+
+# Entities are stored as a BLOB of uint16 ids into the vocab table. The
+# mapping is cached in memory in both directions. New terms are only assigned
+# ids by the writer, inside the batch transaction, so the request path never
+# writes and every worker resolves the same ids.
+VOCAB_MAX_ID = 0xFFFF
+# Id blobs are always little-endian so the database file is portable
+_SWAP_ID_BYTES = sys.byteorder == 'big'
+
+_vocab_ids: Dict[str, int] = {}
+_vocab_terms: List[Optional[str]] = []
+_vocab_loaded_id = 0  # every id up to here has been read from the table
+_vocab_lock = threading.Lock()
+_vocab_full = False
+
+def _cache_vocab(rows):
+    with _vocab_lock:
+        for term_id, term in rows:
+            if term_id >= len(_vocab_terms):
+                _vocab_terms.extend([None] * (term_id + 1 - len(_vocab_terms)))
+            _vocab_terms[term_id] = term
+            _vocab_ids[term] = term_id
+
+def _load_vocab():
+    """Read the vocab rows added since the last load.
+
+    Writers serialize on BEGIN IMMEDIATE and ids only grow, so everything at
+    or below the highest id seen is already loaded or cached by our writer.
+    """
+    global _vocab_loaded_id
+    rows = DB.execute(
+        "SELECT id, term FROM vocab WHERE id > ? ORDER BY id", (_vocab_loaded_id,)
+    ).fetchall()
+    if rows:
+        _cache_vocab(rows)
+        with _vocab_lock:
+            _vocab_loaded_id = max(_vocab_loaded_id, rows[-1][0])
 
-init_db()
+def _vocab_term(term_id: int) -> Optional[str]:
+    if term_id >= len(_vocab_terms) or _vocab_terms[term_id] is None:
+        # Added by another worker since we last loaded
+        _load_vocab()
+        if term_id >= len(_vocab_terms) or _vocab_terms[term_id] is None:
+            logger.error("Unknown vocab id %d in stored entities", term_id)
+            return None
+    return _vocab_terms[term_id]
+
+def encode_entities(entities: List[str], new_terms: Dict[str, int]):
+    """Encode entities for storage. Must run inside the writer's transaction.
+
+    Ids assigned here are collected in `new_terms` and only cached once the
+    transaction commits. Once the vocabulary is full, rows with unseen terms
+    are stored as tab-separated text instead.
+    """
+    global _vocab_full
+    ids = array('H')
+    for entity in entities:
+        term_id = _vocab_ids.get(entity, new_terms.get(entity))
+        if term_id is None:
+            row = WRITER_DB.execute("SELECT id FROM vocab WHERE term = ?", (entity,)).fetchone()
+            if row:
+                term_id = row[0]
+            else:
+                if _vocab_full or WRITER_DB.execute("SELECT COALESCE(MAX(id), 0) FROM vocab").fetchone()[0] >= VOCAB_MAX_ID:
+                    _vocab_full = True
+                    return '\t'.join(entities)
+                term_id = WRITER_DB.execute("INSERT INTO vocab (term) VALUES (?)", (entity,)).lastrowid
+            new_terms[entity] = term_id
+        ids.append(term_id)
+    if _SWAP_ID_BYTES:
+        ids.byteswap()
+    return ids.tobytes()
+
+def decode_entities(value) -> List[str]:
+    """Decode a stored entities value.
+
+    Besides id BLOBs, older rows hold tab-separated text or a JSON array.
+    """
+    if not value:
+        return []
+    if isinstance(value, bytes):
+        ids = array('H')
+        ids.frombytes(value)
+        if _SWAP_ID_BYTES:
+            ids.byteswap()
+        # Unknown ids are logged by _vocab_term and left out
+        terms = [_vocab_term(term_id) for term_id in ids]
+        return [term for term in terms if term is not None]
+    if value.startswith('['):
+        return json.loads(value)
+    return value.split('\t')
 
 
 class IssueInput(BaseModel):
     text: str
 
+class BulkIssueInput(BaseModel):
+    items: List[IssueInput]
+
 class Issue(BaseModel):
     id: str
     raw_text: str
@@ -49,6 +262,13 @@ class Issue(BaseModel):
     entities: List[str]
     timestamp: str
 
+# Entity patterns, compiled once at import
+_RE_VERSION = re.compile(r'version\s+(\d+(?:\.\d+)*)', re.IGNORECASE)
+_RE_VENDOR = re.compile(r'vendor\s+([A-Z][a-z]+)')
+_RE_COMPONENT = re.compile(r'(\w+)\s+(?:board|motor|pump|sensor|valve)', re.IGNORECASE)
+_RE_NODE = re.compile(r'node\s+([A-Z]\d*)', re.IGNORECASE)
+_RE_TIME = re.compile(r'(\d+)\s+(hour|minute|day|week|month)', re.IGNORECASE)
+
 class IssueClassifier:
     CATEGORIES = {
         'Equipment': [
@@ -81,31 +301,31 @@ class IssueClassifier:
     }
     
     @staticmethod
-    def classify_category(text: str) -> str:
-        text_lower = text.lower()
-        scores = {}
+    def classify_category(text_lower: str) -> str:
+        hits = _keyword_hits(text_lower)
         
-        for category, keywords in IssueClassifier.CATEGORIES.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            scores[category] = score
+        # Each category owns one 8-bit lane of `packed`, so summing the
+        # per-keyword lane values counts every category at once
+        packed = sum(map(_KEYWORD_CATEGORY_LANES.__getitem__, hits))
         
-        if all(score == 0 for score in scores.values()):
+        if not packed:
             return 'Other'
         
-        return max(scores, key=scores.get)
+        scores = [(packed >> shift) & _LANE_MASK for shift in _LANE_SHIFTS]
+        return _CATEGORY_NAMES[scores.index(max(scores))]
     
     @staticmethod
-    def detect_severity(text: str) -> str:
-        text_lower = text.lower()
-        
-        for severity, keywords in IssueClassifier.SEVERITY_KEYWORDS.items():
-            if any(keyword in text_lower for keyword in keywords):
+    def detect_severity(text_lower: str) -> str:
+        # Levels are checked in priority order, so a critical marker returns
+        # without scanning for the lower levels
+        for severity, pattern in _SEVERITY_PATTERNS:
+            if pattern.search(text_lower):
                 return severity
         
         # Default heuristics
-        if '!' in text or 'failed' in text_lower or 'error' in text_lower:
+        if '!' in text_lower or 'failed' in text_lower or 'error' in text_lower:
             return 'high'
-        elif '?' in text:
+        elif '?' in text_lower:
             return 'low'
         
         return 'medium'
@@ -115,26 +335,98 @@ class IssueClassifier:
         entities = []
         
         # Extract version numbers
-        versions = re.findall(r'version\s+(\d+(?:\.\d+)*)', text, re.IGNORECASE)
+        versions = _RE_VERSION.findall(text)
         entities.extend([f"v{v}" for v in versions])
         
         # Extract vendor names
-        vendors = re.findall(r'vendor\s+([A-Z][a-z]+)', text)
+        vendors = _RE_VENDOR.findall(text)
         entities.extend(vendors)
         
         # Extract component names
-        components = re.findall(r'(\w+)\s+(?:board|motor|pump|sensor|valve)', text, re.IGNORECASE)
+        components = _RE_COMPONENT.findall(text)
         entities.extend([c.upper() for c in components])
         
         # Extract node/location identifiers
-        nodes = re.findall(r'node\s+([A-Z]\d*)', text, re.IGNORECASE)
+        nodes = _RE_NODE.findall(text)
         entities.extend([n.upper() for n in nodes])
         
         # Extract time periods
-        times = re.findall(r'(\d+)\s+(hour|minute|day|week|month)', text, re.IGNORECASE)
+        times = _RE_TIME.findall(text)
         entities.extend([f"{num} {unit}" for num, unit in times])
         
         return list(set(entities))
+    
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def analyze(text: str) -> Tuple[str, str, Tuple[str, ...]]:
+        """Category, severity and entities for `text`.
+
+        Cached because retried and templated reports repeat the same text.
+        Keyed on the original text since entity extraction is case-sensitive;
+        entities come back as a tuple so cached results can't be mutated.
+        """
+        text_lower = text.lower()
+        return (
+            IssueClassifier.classify_category(text_lower),
+            IssueClassifier.detect_severity(text_lower),
+            tuple(IssueClassifier.extract_entities(text)),
+        )
+
+_CATEGORY_NAMES = tuple(IssueClassifier.CATEGORIES)
+_LANE_BITS = 8
+_LANE_MASK = (1 << _LANE_BITS) - 1
+_LANE_SHIFTS = tuple(i * _LANE_BITS for i in range(len(_CATEGORY_NAMES)))
+
+def _flatten_category_keywords():
+    """Flatten CATEGORIES into two parallel tuples indexed by keyword id:
+    the deduplicated keywords and each keyword's packed category lanes.
+
+    Lanes are OR-ed in, so a keyword listed twice in one category still
+    counts once.
+    """
+    lanes = {}
+    for shift, keywords in zip(_LANE_SHIFTS, IssueClassifier.CATEGORIES.values()):
+        for keyword in keywords:
+            lanes[keyword] = lanes.get(keyword, 0) | (1 << shift)
+    
+    for category, keywords in IssueClassifier.CATEGORIES.items():
+        if len(set(keywords)) > _LANE_MASK:
+            raise ValueError(f"Too many keywords in category {category!r} for a {_LANE_BITS}-bit lane")
+    
+    keywords = tuple(sorted(lanes))
+    return keywords, tuple(lanes[keyword] for keyword in keywords)
+
+_KEYWORDS, _KEYWORD_CATEGORY_LANES = _flatten_category_keywords()
+
+def _build_keyword_automaton():
+    """Build one Aho-Corasick automaton over every category keyword, so
+    category scoring is a single pass over the text. Matches yield the
+    keyword id.
+    """
+    automaton = ahocorasick.Automaton()
+    for keyword_id, keyword in enumerate(_KEYWORDS):
+        automaton.add_word(keyword, keyword_id)
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+# One whole-word alternation per severity level, in priority order. Word
+# boundaries keep e.g. 'issue' from matching inside 'tissue'.
+_SEVERITY_PATTERNS = tuple(
+    (severity, re.compile(r'\b(?:' + '|'.join(map(re.escape, keywords)) + r')\b'))
+    for severity, keywords in IssueClassifier.SEVERITY_KEYWORDS.items()
+)
+
+_match_id = itemgetter(1)
+
+def _keyword_hits(text_lower: str) -> set:
+    """Ids of the distinct keywords found in `text_lower`.
+
+    Built with set/map/itemgetter so the loop over matches runs in C rather
+    than in the interpreter.
+    """
+    return set(map(_match_id, _KEYWORD_AUTOMATON.iter(text_lower)))
 
 @app.get("/")
 async def root():
@@ -153,23 +445,15 @@ async def create_issue(issue_input: IssueInput):
         raise HTTPException(status_code=400, detail="Issue text cannot be empty")
     
     # Generate unique ID
-    issue_id = hashlib.md5(f"{text}{datetime.now().isoformat()}".encode()).hexdigest()[:12]
+    issue_id = uuid.uuid4().hex[:12]
     
     # Process the issue using our classification engine
-    category = IssueClassifier.classify_category(text)
-    severity = IssueClassifier.detect_severity(text)
-    entities = IssueClassifier.extract_entities(text)
+    category, severity, entities = IssueClassifier.analyze(text)
+    entities = list(entities)
     timestamp = datetime.now().isoformat()
     
-    # Store in database
-    conn = sqlite3.connect('issueflow.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO issues (id, raw_text, category, severity, entities, timestamp)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (issue_id, text, category, severity, json.dumps(entities), timestamp))
-    conn.commit()
-    conn.close()
+    # Queue for the background writer
+    _write_q.put_nowait((issue_id, text, category, severity, entities, timestamp))
     
     return Issue(
         id=issue_id,
@@ -180,14 +464,56 @@ async def create_issue(issue_input: IssueInput):
         timestamp=timestamp
     )
 
+MAX_BULK_ITEMS = 10000
+
+# Plain def: FastAPI runs it in the threadpool, so classifying a large batch
+# and waiting on the write lock doesn't block the event loop
+@app.post("/issues/bulk")
+def create_issues_bulk(bulk_input: BulkIssueInput):
+    if len(bulk_input.items) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_BULK_ITEMS} issues can be imported per request"
+        )
+    
+    texts = [item.text.strip() for item in bulk_input.items]
+    
+    if not all(texts):
+        raise HTTPException(status_code=400, detail="Issue text cannot be empty")
+    
+    # One timestamp for the whole batch: the items arrived together
+    timestamp = datetime.now().isoformat()
+    
+    issues = []
+    rows = []
+    for text in texts:
+        issue_id = uuid.uuid4().hex[:12]
+        category, severity, entities = IssueClassifier.analyze(text)
+        entities = list(entities)
+        
+        rows.append((issue_id, text, category, severity, entities, timestamp))
+        issues.append({
+            'id': issue_id,
+            'raw_text': text,
+            'category': category,
+            'severity': severity,
+            'entities': entities,
+            'timestamp': timestamp
+        })
+    
+    # Written synchronously in one transaction, so the whole import lands
+    # with a single commit and is visible as soon as this returns
+    insert_issues(rows)
+    
+    return {'issues': issues, 'count': len(issues)}
+
 @app.get("/issues")
 async def get_issues(
     category: Optional[str] = None,
     severity: Optional[str] = None,
     limit: int = 100
 ):
-    conn = sqlite3.connect('issueflow.db')
-    cursor = conn.cursor()
+    cursor = DB.cursor()
     
     query = "SELECT id, raw_text, category, severity, entities, timestamp FROM issues WHERE 1=1"
     params = []
@@ -205,7 +531,6 @@ async def get_issues(
     
     cursor.execute(query, params)
     rows = cursor.fetchall()
-    conn.close()
     
     issues = []
     for row in rows:
@@ -214,48 +539,70 @@ async def get_issues(
             'raw_text': row[1],
             'category': row[2],
             'severity': row[3],
-            'entities': json.loads(row[4]),
+            'entities': decode_entities(row[4]),
             'timestamp': row[5]
         })
     
     return {'issues': issues, 'count': len(issues)}
 
+# Dashboards poll /analytics; serve a recent result unless this process has
+# written since. Writes from other workers only show up once the TTL expires.
+ANALYTICS_TTL = 5.0  # seconds
+
+_analytics_cache = {'time': 0.0, 'generation': -1, 'value': None}
+
 @app.get("/analytics")
 async def get_analytics():
-    conn = sqlite3.connect('issueflow.db')
-    cursor = conn.cursor()
-    
-    
-    cursor.execute("SELECT COUNT(*) FROM issues")
-    total = cursor.fetchone()[0]
+    now = time.monotonic()
+    if (
+        _analytics_cache['value'] is not None
+        and _analytics_cache['generation'] == _write_generation
+        and now - _analytics_cache['time'] < ANALYTICS_TTL
+    ):
+        return _analytics_cache['value']
     
+    generation = _write_generation
+    analytics = compute_analytics()
+    _analytics_cache.update(time=now, generation=generation, value=analytics)
+    return analytics
+
+def compute_analytics():
+    now = datetime.now()
+    seven_days_ago = (now - timedelta(days=7)).isoformat()
     
-    cursor.execute("SELECT category, COUNT(*) FROM issues GROUP BY category")
-    by_category = dict(cursor.fetchall())
-    
-   
-    cursor.execute("SELECT severity, COUNT(*) FROM issues GROUP BY severity")
-    by_severity = dict(cursor.fetchall())
-    
- 
-    seven_days_ago = (datetime.now() - timedelta(days=7)).isoformat()
+    # All aggregates in one round trip; the first column tags each row
+    cursor = DB.cursor()
     cursor.execute("""
-        SELECT DATE(timestamp) as date, COUNT(*) as count
+        SELECT 'total', NULL, COUNT(*) FROM issues
+        UNION ALL
+        SELECT 'category', category, COUNT(*) FROM issues GROUP BY category
+        UNION ALL
+        SELECT 'severity', severity, COUNT(*) FROM issues GROUP BY severity
+        UNION ALL
+        SELECT 'day', substr(timestamp, 1, 10), COUNT(*)
         FROM issues
         WHERE timestamp >= ?
-        GROUP BY DATE(timestamp)
-        ORDER BY date
+        GROUP BY substr(timestamp, 1, 10)
     """, (seven_days_ago,))
-    trend_raw = cursor.fetchall()
-    
-    conn.close()
     
+    total = 0
+    by_category = {}
+    by_severity = {}
+    trend_counts = {}
+    for tag, key, count in cursor.fetchall():
+        if tag == 'total':
+            total = count
+        elif tag == 'category':
+            by_category[key] = count
+        elif tag == 'severity':
+            by_severity[key] = count
+        else:
+            trend_counts[key] = count
     
     trend = []
     for i in range(7):
-        date = (datetime.now() - timedelta(days=6-i)).strftime('%Y-%m-%d')
-        count = next((c for d, c in trend_raw if d == date), 0)
-        trend.append({'date': date, 'count': count})
+        date = (now - timedelta(days=6-i)).strftime('%Y-%m-%d')
+        trend.append({'date': date, 'count': trend_counts.get(date, 0)})
     
     return {
         'total_issues': total,
@@ -270,4 +617,14 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # One process per core; each worker opens its own DB connections and
+    # writer thread at startup, and WAL lets them share the file. "auto"
+    # picks uvloop and httptools wherever they're installed.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count(),
+        loop="auto",
+        http="auto",
+    )
\ No newline at end of file